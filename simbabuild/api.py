@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import simbabuild.utility
+
 from simbabuild.context import Context, gcontext
+from simbabuild.fsbatch import ensure_dirs
 from simbabuild.utility import (
     bunch, error, fatal, chdir, stop_on_error, status, async_shell,
 )
 
 import os
 import sys
-import inspect
+import json
+import time
+import string
+import marshal
 import asyncio
+import hashlib
+import itertools
 
 
 class API(type):
@@ -42,7 +50,7 @@ class api(metaclass=API):
 
 from simbabuild.builtin_recipes import load_recipes  # noqa: E402
 from simbabuild.apiutility import (  # noqa: E402
-    Target, TargetValidator, VariableGetter, expand_files,
+    FrameInfo, Target, TargetValidator, VariableGetter, expand_files,
 )
 from simbabuild.apimixins import expandable, prefixed, nofwdref  # noqa: E402
 
@@ -51,27 +59,68 @@ api(error)
 api(fatal)
 
 
+"""
+Sentinel for absent dictionary entries
+"""
+_MISSING = object()
+
+
+"""
+Monotonic timestamp of the last rendered status line, with the minimum
+interval between renders.  The spinner refreshes at a few hertz, so
+status updates arriving faster than that are never seen.
+"""
+_last_status: list[float] = [0.0]
+_STATUS_INTERVAL = 0.05
+
+
 class TargetPool:
-    all: set = set()
-    skipped: set = set()
-    running: set = set()
-    failed: set = set()
-    finished: set = set()
+    """
+    Tracks the lifecycle state of every known target.
+
+    Targets live in a single target to state mapping with one running
+    counter per state, so progress reporting reads five integers instead
+    of hashing five separate sets.
+    """
+
+    ALL = 0
+    SKIPPED = 1
+    RUNNING = 2
+    FAILED = 3
+    FINISHED = 4
+
+    def __init__(self):
+        self.state: dict = dict()
+        self.counts: list = [0] * 5
 
     def add(self, target):
-        self.all.add(target)
+        if target not in self.state:
+            self.state[target] = self.ALL
+            self.counts[self.ALL] += 1
         return True
 
+    def move(self, target, state: int):
+        old = self.state.get(target, self.ALL)
+        if old == state:
+            return
+
+        if old != self.ALL:
+            self.counts[old] -= 1
+
+        self.state[target] = state
+        self.counts[state] += 1
+
     def skip(self, target):
         if self.add(target):
-            self.skipped.add(target)
+            self.move(target, self.SKIPPED)
 
     def progress_str(self):
-        l_all = len(self.all)
-        l_ski = len(self.skipped)
-        l_run = len(self.running)
-        l_fai = len(self.failed)
-        l_fin = len(self.finished)
+        counts = self.counts
+        l_all = counts[self.ALL]
+        l_ski = counts[self.SKIPPED]
+        l_run = counts[self.RUNNING]
+        l_fai = counts[self.FAILED]
+        l_fin = counts[self.FINISHED]
         l_com = l_ski + l_fai + l_fin
         l_rem = l_all - (l_com + l_run)
 
@@ -119,15 +168,46 @@ class _:
         stop_on_error()
 
         _.phase = 'prepare'
-        for k, target in self.registry.items():
-            await self.prepare(target)
+
+        # targets prepare independently, so run them concurrently with the
+        # fan-out bounded to the CPU count
+        sem = asyncio.Semaphore(os.cpu_count() or 8)
+
+        async def prepare_one(target):
+            async with sem:
+                await self.prepare(target)
+
+        await asyncio.gather(
+            *(prepare_one(t) for t in list(self.registry.values()))
+        )
 
         stop_on_error()
 
         _.phase = 'postload'
 
     @classmethod
-    def report_status(cls, msg: str):
+    def report_status(cls, msg: str, *args):
+        """
+        Report a progress status line.
+
+        Formatting is lazy: callers pass the format arguments through, so
+        when status output is disabled nothing is formatted at all.
+        Updates are also rate limited to the spinner refresh rate, except
+        when debugging wants every line logged.
+        """
+
+        if not (simbabuild.utility.show_status or simbabuild.utility.debugging):
+            return
+
+        if not simbabuild.utility.debugging:
+            now = time.monotonic()
+            if now - _last_status[0] < _STATUS_INTERVAL:
+                return
+            _last_status[0] = now
+
+        if args:
+            msg = msg % args
+
         status('%s %s' % (cls.pool.progress_str(), msg))
 
     @classmethod
@@ -140,7 +220,7 @@ class _:
         if target in cls.visited:
             return
 
-        if 'is_forward_ref' in dir(target.__class__) and target.is_forward_ref():
+        if hasattr(type(target), 'is_forward_ref') and target.is_forward_ref():
             target.fatal("forward reference")
 
         cls.visited.add(target)
@@ -148,7 +228,7 @@ class _:
 
     @classmethod
     def update(cls, obj: bunch) -> bunch:
-        tname = obj.target_name()
+        tname = sys.intern(obj.target_name())
         override = False
         default = False
 
@@ -172,17 +252,18 @@ class _:
             elif robj.name == 'default' and not hasattr(robj.__class__, 'default'):
                 robj.__class__.default = robj
 
-            for key, value in obj:
-                if key == 'name':
+            rdict = robj.__dict__
+            for key, value in obj.__dict__.items():
+                # hidden fields are internal state, never merged
+                if key == 'name' or key[0] == '_':
                     continue
 
-                if key.startswith('_'):
-                    obj.error("forbidden field", field=key)
-
-                if hasattr(robj, key) and getattr(robj, key) != value and not override:
+                existing = rdict.get(key, _MISSING)
+                if existing is not _MISSING and existing != value \
+                   and not override:
                     robj.error("already exists (use override=True)", field=key)
 
-                setattr(robj, key, value)
+                rdict[key] = value
 
             return robj
 
@@ -194,15 +275,57 @@ class _:
         _.ensure_can_create(obj)
         return obj
 
+    @classmethod
+    def _load_code(cls, path: str):
+        """
+        Compile a recipe file to a code object.
+
+        Compiled recipes are cached with marshal under the build
+        directory, keyed on the recipe path and stat, so a warm include
+        skips parsing and compiling entirely.  The source is read as
+        bytes and handed to compile directly, avoiding an intermediate
+        decoded copy.
+        """
+
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+
+        cachefile = None
+        if st is not None:
+            digest = hashlib.blake2b(
+                ('%s:%d:%d' % (path, st.st_mtime_ns, st.st_size)).encode()
+            ).hexdigest()
+            cachefile = os.path.join(
+                api.simba.options.builddir, '.simba-cache', 'pyc', digest
+            )
+
+            try:
+                with open(cachefile, 'rb') as file:
+                    return marshal.load(file)
+            except (OSError, EOFError, ValueError):
+                pass
+
+        with open(path, 'rb') as file:
+            code = compile(file.read(), path, 'exec')
+
+        if cachefile is not None:
+            try:
+                os.makedirs(os.path.dirname(cachefile), exist_ok=True)
+                with open(cachefile, 'wb') as file:
+                    marshal.dump(code, file)
+            except (OSError, ValueError):
+                pass
+
+        return code
+
     @classmethod
     def include(cls, path: str) -> None:
         stop_on_error()
 
         if not os.path.isabs(path):
-            path = os.path.join(
-                os.path.dirname(cls.context.__file__),
-                path
-            )
+            path = os.path.join(cls.context._ctxfolder, path)
 
         if os.path.isdir(path):
             path = os.path.join(path, 'simba.py')
@@ -215,15 +338,8 @@ class _:
             try:
                 cls.context = child
                 child.__file__ = path
-                with open(child.__file__, 'r') as file:
-                    exec(
-                        compile(
-                            file.read(),
-                            child.__file__,
-                            'exec'
-                        ),
-                        child.__dict__,
-                    )
+                child._ctxfolder = os.path.dirname(path)
+                exec(cls._load_code(path), child.__dict__)
             finally:
                 cls.context = child.parent
 
@@ -267,7 +383,9 @@ class target(expandable, bunch, metaclass=Target):
     # the hidden context
     _context: Context
     # the frame where the target was defined
-    _frame: inspect.Traceback
+    _frame: FrameInfo
+    # memoized forward reference resolution
+    _is_fwd_ref: bool | None = None
 
     def error(self, reason: str, *, field=None):
         prefix = str(self)
@@ -296,11 +414,17 @@ class target(expandable, bunch, metaclass=Target):
         prepare stage.
         """
 
+        if self._is_fwd_ref is False:
+            return False
+
         for key, value in self:
             if key.startswith('_'):
                 continue
 
             if key != 'name':
+                # attributes are never removed, so once resolved a target
+                # can't revert to a forward reference
+                self._is_fwd_ref = False
                 return False
 
         return True
@@ -373,11 +497,18 @@ class path(nofwdref, namedtarget):
     They are relative to the recipe location.
     """
 
+    # memoized resolved path
+    _cached_path: str | None = None
+
     def get_path(self):
-        if os.path.isabs(self.name):
-            return self.name
-        ctxfolder = os.path.dirname(self._context.__file__)
-        return os.path.join(ctxfolder, self.name)
+        path = self._cached_path
+        if path is None:
+            if os.path.isabs(self.name):
+                path = self.name
+            else:
+                path = os.path.join(self._context._ctxfolder, self.name)
+            self._cached_path = path
+        return path
 
     async def generate(self):
         return self.name
@@ -420,8 +551,9 @@ class files(expandable, bunch):
     def __init__(self, *args):
         self.sources = args
 
+        frame = sys._getframe(1)
         self._context = _.context
-        self._frame = inspect.getframeinfo(inspect.stack()[1][0])
+        self._frame = FrameInfo(frame.f_code.co_filename, frame.f_lineno)
 
 
 @api
@@ -461,9 +593,140 @@ class environment(namedtarget):
             self.includes = set()
 
 
+    # rendered include strings, keyed by the generator include format
+    _includes_cache: dict | None = None
+
+    def _rendered_includes(self, includefmt: str) -> str:
+        """
+        Render the include flags once per include format.
+
+        The include set is stable after resolve, while the same
+        environment is formatted into every command using it.
+        """
+
+        cache = self._includes_cache
+        if cache is None:
+            cache = self._includes_cache = dict()
+
+        rendered = cache.get(includefmt)
+        if rendered is None:
+            rendered = ' '.join(
+                includefmt % i.get_path() for i in self.includes
+            )
+            cache[includefmt] = rendered
+
+        return rendered
+
     def variable_getter(self):
         return VariableGetter(self.variables)
 
+class BuildScheduler:
+    """
+    Critical-path aware scheduler for dependency generation.
+
+    Instead of recursively fanning out one task per edge, the scheduler
+    materializes the dependency DAG once, prioritizes targets by their
+    critical path length and feeds ready targets to a bounded worker
+    pool, so targets blocking the longest chains run first and leaf-heavy
+    tails don't stall behind head-of-line blocking.
+    """
+
+    __slots__ = (
+        'root', 'deps', 'pending', 'dependents', 'priority', 'outputs',
+    )
+
+    def __init__(self, root: dependency):
+        self.root = root
+        # target -> its direct dependencies, in discovery order
+        self.deps: dict = dict()
+        # target -> number of not yet generated dependencies
+        self.pending: dict = dict()
+        # target -> targets waiting on its output
+        self.dependents: dict = dict()
+        # target -> critical path length up to the root
+        self.priority: dict = dict()
+        # target -> generated output
+        self.outputs: dict = dict()
+
+    async def _collect(self, target, depth: int):
+        if target in self.deps:
+            if depth > self.priority[target]:
+                # found a longer path to the root; bump the subgraph
+                self.priority[target] = depth
+                for dep in self.deps[target]:
+                    await self._collect(dep, depth + 1)
+            return
+
+        self.priority[target] = depth
+        deps = self.deps[target] = list()
+
+        async for dep in target.get_dependencies():
+            deps.append(dep)
+            self.dependents.setdefault(dep, list()).append(target)
+            await self._collect(dep, depth + 1)
+
+        self.pending[target] = len(deps)
+
+    async def run(self):
+        await self._collect(self.root, 0)
+
+        # tuples are (negated priority, tiebreaker, target) since targets
+        # themselves aren't orderable
+        queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        tiebreak = itertools.count()
+        stop = (1, 0, None)
+
+        for target, npending in self.pending.items():
+            if npending == 0:
+                queue.put_nowait((-self.priority[target], next(tiebreak), target))
+
+        total = len(self.deps)
+        nworkers = min(total, os.cpu_count() or 4)
+        done = 0
+
+        async def worker():
+            nonlocal done
+
+            while True:
+                _, _, target = await queue.get()
+                if target is None:
+                    return
+
+                inputs = [self.outputs[dep] for dep in self.deps[target]]
+
+                try:
+                    self.outputs[target] = await target._generate(inputs)
+                except BaseException:
+                    # wake the other workers so the gather below completes
+                    for n in range(nworkers):
+                        queue.put_nowait(stop)
+                    raise
+
+                done += 1
+                if done == total:
+                    for n in range(nworkers):
+                        queue.put_nowait(stop)
+                    continue
+
+                for parent in self.dependents.get(target, ()):
+                    self.pending[parent] -= 1
+                    if self.pending[parent] == 0:
+                        queue.put_nowait(
+                            (-self.priority[parent], next(tiebreak), parent)
+                        )
+
+        results = await asyncio.gather(
+            *(worker() for n in range(nworkers)),
+            return_exceptions=True,
+        )
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+        return self.outputs[self.root]
+
+
 @api
 class dependency(target):
     async def _prepare(self):
@@ -544,15 +807,15 @@ class dependency(target):
         return dependency.create(name, kind='shared_library', sources=sources, **kwargs)
 
     async def get_output(self):
-        ctxfolder = os.path.dirname(self._context.__file__)
-        isources = self.get_sources()
-        source = await anext(isources, None)
+        ctxfolder = self._context._ctxfolder
+        sources = await self._get_sources_list()
+        source = sources[0] if sources else None
 
         if self.provider == 'local':
             return source
 
         if not source or \
-           await anext(isources, None) or \
+           len(sources) > 1 or \
            self.kind == 'executable' or \
            self.kind == 'static_library' or \
            self.kind == 'shared_library':
@@ -566,8 +829,19 @@ class dependency(target):
             ft = await filetype.find(source).expand()
             return await anext(ft.generator.get_output(source, kind=self.kind))
 
+    # memoized source expansion, deterministic once a target is defined
+    _sources_cache: list | None = None
+
+    async def _get_sources_list(self) -> list:
+        if self._sources_cache is None:
+            self._sources_cache = [
+                f async for f in expand_files(self, self.sources)
+            ]
+
+        return self._sources_cache
+
     async def get_sources(self):
-        async for f in expand_files(self, self.sources):
+        for f in await self._get_sources_list():
             yield f
 
     async def get_aliases(self):
@@ -581,7 +855,7 @@ class dependency(target):
         for dep in self.dependencies:
             yield await dep.expand()
 
-        async for source in self.get_sources():
+        for source in await self._get_sources_list():
             ft = filetype.try_find(source)
             if self.kind == 'executable' and ft is None:
                 self.fatal("no filetype for '%s'" % source)
@@ -611,18 +885,9 @@ class dependency(target):
     async def generate(self):
         await self.expand()
 
-        tasks = set()
+        return await BuildScheduler(self).run()
 
-        try:
-            async with asyncio.TaskGroup() as tg:
-                async for d in self.get_dependencies():
-                    task = tg.create_task(d.generate())
-                    tasks.add(task)
-        except ExceptionGroup as eg:
-            for e in eg.exceptions:
-                raise e
-
-        inputs = [t.result() for t in tasks]
+    async def _generate(self, inputs: list):
         out = await self.get_output()
 
         if self.provider != 'local' and self.generator:
@@ -645,6 +910,68 @@ class project(namedtarget):
             v.field('metadata', bunch, required=False)
 
 
+"""
+Output extension per dependency kind
+"""
+_KIND_EXT = {
+    'executable': '',
+    'static_library': '.a',
+    'shared_library': '.so',
+    'object': '.o',
+}
+_DEFAULT_EXT = '.out'
+
+"""
+Compiled format templates, keyed by the template string
+"""
+_templates: dict = dict()
+
+_formatter = string.Formatter()
+
+
+def _compile_template(template: str):
+    """
+    Pre-parse a str.format style template into its literal/field parts,
+    returning a renderer that only does lookups and a join.
+
+    Templates are parsed once per unique string instead of on every
+    format_map call.
+    """
+
+    render = _templates.get(template)
+    if render is not None:
+        return render
+
+    parts = list(_formatter.parse(template))
+    get_field = _formatter.get_field
+
+    def render(mapping) -> str:
+        chunks = []
+        for literal, field, spec, conversion in parts:
+            if literal:
+                chunks.append(literal)
+
+            if field is None:
+                continue
+
+            if '.' in field or '[' in field:
+                value = get_field(field, (), mapping)[0]
+            else:
+                value = mapping[field]
+
+            if conversion == 'r':
+                value = repr(value)
+            else:
+                value = str(value)
+
+            chunks.append(format(value, spec) if spec else value)
+
+        return ''.join(chunks)
+
+    _templates[template] = render
+    return render
+
+
 @api
 class generator(namedtarget):
     async def _prepare(self):
@@ -675,16 +1002,7 @@ class generator(namedtarget):
 
     @staticmethod
     def kind_to_ext(kind: str):
-        if kind == 'executable':
-            return ''
-        elif kind == 'static_library':
-            return '.a'
-        elif kind == 'shared_library':
-            return '.so'
-        elif kind == 'object':
-            return '.o'
-        else:
-            return '.out'
+        return _KIND_EXT.get(kind, _DEFAULT_EXT)
 
     def get_format(self, string, input, environment, output):
         if isinstance(input, str):
@@ -693,7 +1011,7 @@ class generator(namedtarget):
         input_str = ' '.join(["'%s'" % i for i in input])
         output_str = "'%s'" % output
 
-        return string.format_map({
+        return _compile_template(string)({
             'exe': self.executor.path,
             'executor': self.executor.path,
 
@@ -706,9 +1024,68 @@ class generator(namedtarget):
 
             'env': environment.variable_getter(),
             'environment': environment.variable_getter(),
-            'includes': ' '.join([self.includefmt % i.get_path() for i in environment.includes]),
+            'includes': environment._rendered_includes(self.includefmt),
         })
 
+    @staticmethod
+    def _memo_dir():
+        return os.path.join(api.simba.options.builddir, '.simba-cache')
+
+    @staticmethod
+    def _memo_key(cmd: str, input: str | list[str]) -> str | None:
+        """
+        Hash the command together with the stat of every input.
+
+        Any change to the command (and hence the environment variables and
+        includes expanded into it) or to an input invalidates the key.
+        """
+
+        state = hashlib.blake2b(cmd.encode())
+
+        try:
+            for path in input if isinstance(input, list) else [input]:
+                st = os.stat(path)
+                state.update(
+                    ('\0%s:%d:%d' % (path, st.st_mtime_ns, st.st_size)).encode()
+                )
+        except OSError:
+            return None
+
+        return state.hexdigest()
+
+    @classmethod
+    def _memo_load(cls, key: str, output: str) -> str | None:
+        try:
+            with open(os.path.join(cls._memo_dir(), key), 'r') as file:
+                entry = json.load(file)
+
+            st = os.stat(output)
+        except (OSError, ValueError):
+            return None
+
+        if entry.get('output') != output or \
+           entry.get('mtime_ns') != st.st_mtime_ns or \
+           entry.get('size') != st.st_size:
+            return None
+
+        return output
+
+    @classmethod
+    def _memo_store(cls, key: str, output: str) -> None:
+        memodir = cls._memo_dir()
+
+        try:
+            st = os.stat(output)
+            os.makedirs(memodir, exist_ok=True)
+            with open(os.path.join(memodir, key), 'w') as file:
+                json.dump({
+                    'output': output,
+                    'mtime_ns': st.st_mtime_ns,
+                    'size': st.st_size,
+                }, file)
+        except OSError:
+            pass
+
     async def generate(
         self,
         input: str | list[str],
@@ -721,28 +1098,39 @@ class generator(namedtarget):
             output = await self.get_output(input, kind=kind)
 
         output = builder.builddir_path(output)
-        os.makedirs(os.path.dirname(output), exist_ok=True)
+        await ensure_dirs([os.path.dirname(output)])
 
-        _.report_status(
-            "Generating %s..." % self.get_format(
-                self.description, input, environment, output
-            )
-        )
         cmd = self.get_format(self.command, input, environment, output)
+
+        key = self._memo_key(cmd, input)
+        if key is not None and self._memo_load(key, output) is not None:
+            # inputs, command and output unchanged since the last run
+            return output
+
+        if simbabuild.utility.show_status or simbabuild.utility.debugging:
+            _.report_status(
+                "Generating %s..." % self.get_format(
+                    self.description, input, environment, output
+                )
+            )
         proc, stdout, stderr = await async_shell(cmd)
 
+        if key is not None:
+            self._memo_store(key, output)
+
         return output
 
 
     async def get_output(self, input: str | list[str], *, kind: str = 'object'):
         kindext = generator.kind_to_ext(kind)
+        render = _compile_template(self.output)
         if isinstance(input, str):
             filename, ext = os.path.splitext(input)
-            yield self.output.format(**locals())
+            yield render(locals())
         else:
             for input in input:
                 filename, ext = os.path.splitext(input)
-                yield self.output.format(*locals())
+                yield render(locals())
 
 
 @api
@@ -843,7 +1231,13 @@ class builder(namedtarget):
 @api
 class external(namedtarget, dependency):
     def target_name(self):
-        return 'external.%s::%s' % (self.kind, self.external_name)
+        tname = self._target_name
+        if tname is None:
+            tname = sys.intern(
+                'external.%s::%s' % (self.kind, self.external_name)
+            )
+            self._target_name = tname
+        return tname
 
     async def _prepare(self):
         with TargetValidator(self) as v:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import sys
 import asyncio
 
 from simbabuild.api import api
@@ -11,8 +12,15 @@ class prefixed:
     Defines a target mixin class for a named target.  This is used to prevent
     name clashes across target subtypes.
     """
+    _target_name: str | None = None
+
     def target_name(self):
-        return '%s::%s' % (self.__class__.__name__, self.name)
+        tname = self._target_name
+        if tname is None:
+            # interned so registry lookups hash once and compare by identity
+            tname = sys.intern('%s::%s' % (self.__class__.__name__, self.name))
+            self._target_name = tname
+        return tname
 
 
 class nofwdref:
@@ -32,7 +40,12 @@ class expandable:
 
     _prepared: bool = False
     _expanded: bool = False
-    _expand_lock: asyncio.Lock
+    # set while a prepare/expand run is in flight
+    _preparing: bool = False
+    _expanding: bool = False
+    # waiter events, only allocated when a concurrent caller has to wait
+    _prepared_event: asyncio.Event | None = None
+    _expanded_event: asyncio.Event | None = None
 
     @property
     def expanded(self):
@@ -44,57 +57,54 @@ class expandable:
 
     async def prepare(self):
         if self._prepared:
-            try:
-                await self._expand_lock.acquire()
-                return self
-            finally:
-                self._expand_lock.release()
+            return self
 
-        api._.report_status("Preparing '%s'..." % self)
+        if self._preparing:
+            # wait for the in-flight prepare of another caller
+            if self._prepared_event is None:
+                self._prepared_event = asyncio.Event()
+            await self._prepared_event.wait()
+            return self
 
-        try:
-            self._expand_lock = asyncio.Lock()
-            self._prepared = True
+        api._.report_status("Preparing '%s'...", self)
 
-            await self._expand_lock.acquire()
+        self._preparing = True
 
-            if '_prepare' in dir(self.__class__):
+        try:
+            if hasattr(type(self), '_prepare'):
                 await self._prepare()
 
             return self
         finally:
-            self._expand_lock.release()
+            self._prepared = True
+            if self._prepared_event is not None:
+                self._prepared_event.set()
 
     async def expand(self):
         if self._expanded:
-            try:
-                await self._expand_lock.acquire()
-                return self
-            finally:
-                self._expand_lock.release()
-
-        api._.report_status("Expanding '%s'..." % self)
+            return self
 
-        try:
-            self._expanded = True
+        if self._expanding:
+            # wait for the in-flight expand of another caller
+            if self._expanded_event is None:
+                self._expanded_event = asyncio.Event()
+            await self._expanded_event.wait()
+            return self
 
-            if self._prepared:
-                was_prepared = True
-            else:
-                self._expand_lock = asyncio.Lock()
-                self._prepared = True
-                was_prepared = False
+        api._.report_status("Expanding '%s'...", self)
 
-            await self._expand_lock.acquire()
+        self._expanding = True
 
-            if not was_prepared and '_prepare' in dir(self.__class__):
-                await self._prepare()
+        try:
+            await self.prepare()
 
-            if '_resolve' in dir(self.__class__):
+            if hasattr(type(self), '_resolve'):
                 await self._resolve()
 
             api._.pool.add(self)
 
             return self
         finally:
-            self._expand_lock.release()
+            self._expanded = True
+            if self._expanded_event is not None:
+                self._expanded_event.set()
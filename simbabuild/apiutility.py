@@ -5,16 +5,149 @@ from simbabuild.api import api
 from simbabuild.utility import status, bunch, error, fatal, stop_on_error
 
 import os
-import inspect
+import re
+import sys
 import glob
+import fnmatch
+import functools
+import collections
+
+
+"""
+Lightweight stand-in for inspect's frame info with just the fields the
+error reporting needs.  Unlike inspect.stack(), building one doesn't
+materialize the whole call stack nor read source lines.
+"""
+FrameInfo = collections.namedtuple('FrameInfo', ['filename', 'lineno'])
+
+
+"""
+Memoized glob expansions keyed by the joined pattern, each validated
+against the stat of the recipe folder it was expanded from
+"""
+_glob_cache: dict = dict()
+
+
+def clear_glob_cache() -> None:
+    """
+    Drop the memoized glob expansions, forcing fresh filesystem walks.
+    """
+
+    _glob_cache.clear()
+
+
+def _glob_cached(ctxfolder: str, pattern: str) -> tuple:
+    glob_path = os.path.join(ctxfolder, pattern)
+
+    try:
+        mtime = os.stat(ctxfolder).st_mtime_ns
+    except OSError:
+        mtime = None
+
+    entry = _glob_cache.get(glob_path)
+    if entry is not None and entry[0] == mtime:
+        return entry[1]
+
+    paths = tuple(_fast_glob(glob_path))
+    _glob_cache[glob_path] = (mtime, paths)
+    return paths
+
+
+@functools.lru_cache(maxsize=None)
+def _translate_cached(part: str) -> re.Pattern:
+    return re.compile(fnmatch.translate(part))
+
+
+def _fast_glob(pattern: str) -> list:
+    """
+    Hand-rolled recursive glob over os.scandir.
+
+    Matches the glob.iglob(recursive=True, include_hidden=True) behaviour
+    used for sources, but compiles each pattern component once and takes
+    directory types from the scandir entries instead of issuing stat
+    calls per name.
+    """
+
+    if not glob.has_magic(pattern):
+        return [pattern] if os.path.lexists(pattern) else []
+
+    if os.path.isabs(pattern):
+        folder = os.sep
+        parts = pattern.lstrip(os.sep).split(os.sep)
+    else:
+        folder = ''
+        parts = pattern.split(os.sep)
+
+    results: list = []
+    _glob_walk(folder, parts, 0, results)
+    return results
+
+
+def _glob_walk(folder: str, parts: list, index: int, results: list) -> None:
+    if index == len(parts):
+        if os.path.lexists(folder):
+            results.append(folder)
+        return
+
+    part = parts[index]
+    last = index + 1 == len(parts)
+
+    if part == '**':
+        if last:
+            # everything below the folder, the folder itself included
+            if os.path.isdir(folder):
+                results.append(os.path.join(folder, ''))
+                _glob_tree(folder, results)
+            return
+
+        # zero or more intermediate directories
+        _glob_walk(folder, parts, index + 1, results)
+        try:
+            with os.scandir(folder or '.') as entries:
+                for entry in entries:
+                    # glob's ** follows directory symlinks; keep that
+                    if entry.is_dir():
+                        _glob_walk(entry.path, parts, index, results)
+        except OSError:
+            pass
+        return
+
+    if not glob.has_magic(part):
+        _glob_walk(os.path.join(folder, part), parts, index + 1, results)
+        return
+
+    pattern = _translate_cached(part)
+
+    try:
+        with os.scandir(folder or '.') as entries:
+            for entry in entries:
+                if not pattern.match(entry.name):
+                    continue
+
+                if last:
+                    results.append(os.path.join(folder, entry.name))
+                elif entry.is_dir():
+                    _glob_walk(entry.path, parts, index + 1, results)
+    except OSError:
+        pass
+
+
+def _glob_tree(folder: str, results: list) -> None:
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                results.append(entry.path)
+                if entry.is_dir():
+                    _glob_tree(entry.path, results)
+    except OSError:
+        pass
 
 
 async def expand_files(obj: api.target, sources):
-    ctxfolder = os.path.dirname(obj._context.__file__)
+    ctxfolder = obj._context._ctxfolder
 
     if isinstance(sources, str):
-        glob_path = os.path.join(ctxfolder, sources)
-        for f in glob.iglob(glob_path, recursive=True, include_hidden=True):
+        for f in _glob_cached(ctxfolder, sources):
             yield f
     elif isinstance(sources, api.files):
         async for f in sources.get_sources():
@@ -25,8 +158,7 @@ async def expand_files(obj: api.target, sources):
 
         if next(expander, None):
             sources.fatal("file expands a glob, use 'files' instead")
-    elif isinstance(sources, set) or isinstance(sources, list) or \
-         isinstance(sources, tuple):
+    elif isinstance(sources, (set, list, tuple)):
         for source in sources:
             async for f in expand_files(obj, source):
                 yield f
@@ -45,19 +177,21 @@ class TargetValidator:
     look like, so we can add readable checks to attributes.
     """
 
+    __slots__ = ('obj', 'fields')
+
     """
     Object being validated
     """
     obj: api.target
 
     """
-    Fields required by the target
+    Fields known to the target
     """
-    fields: list[str]
+    fields: set[str]
 
     def __init__(self, obj: api.target):
         self.obj = obj
-        self.fields = list()
+        self.fields = set()
 
     def field(
         self,
@@ -75,28 +209,31 @@ class TargetValidator:
         have a default, in the case of missing it.
         """
 
-        self.fields.append(fieldname)
+        obj = self.obj
+        self.fields.add(fieldname)
 
-        if not hasattr(self.obj, fieldname) or getattr(self.obj, fieldname) is None:
+        field = getattr(obj, fieldname, None)
+        if field is None:
             if required:
-                self.obj.error("field is required", field=fieldname)
+                obj.error("field is required", field=fieldname)
                 return
 
-            setattr(self.obj, fieldname, default)
+            setattr(obj, fieldname, default)
             return
 
-        field = getattr(self.obj, fieldname)
+        # normalized to a tuple so isinstance dispatches in a single call
         if isinstance(fieldtypes, type):
-            fieldtypes = [fieldtypes]
+            fieldtypes = (fieldtypes,)
+        else:
+            fieldtypes = tuple(fieldtypes)
 
-        for t in fieldtypes:
-            if isinstance(field, t):
-                return
+        if isinstance(field, fieldtypes):
+            return
 
         error(
             "field '%s(%s)' expected types %s, but got %s" % (
-                self.obj, fieldname,
-                fieldtypes, type(field),
+                obj, fieldname,
+                list(fieldtypes), type(field),
             )
         )
 
@@ -106,13 +243,17 @@ class TargetValidator:
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
-        for k, v in self.obj:
-            if k.startswith('_'):
+        obj = self.obj
+        fields = self.fields
+
+        # walk the instance dict directly instead of bunch.__iter__
+        for k in obj.__dict__:
+            if k[0] == '_' or k in fields:
                 continue
-            if k not in self.fields:
-                error(
-                    "unrecognized field '%s.%s'" % (self.obj, k)
-                )
+
+            error(
+                "unrecognized field '%s.%s'" % (obj, k)
+            )
 
         stop_on_error()
 
@@ -157,11 +298,13 @@ class Target(type):
 
         obj = bunch(name=name, **kwargs)
         obj.__class__ = cls
-        api._.report_status("Creating target '%s::%s'" % (cls.__name__, obj.name))
+        api._.report_status("Creating target '%s::%s'", cls.__name__, obj.name)
+
+        frame = sys._getframe(1)
 
         robj = api._.update(obj)
         robj._context = api._.context
-        robj._frame = inspect.getframeinfo(inspect.stack()[1][0])
+        robj._frame = FrameInfo(frame.f_code.co_filename, frame.f_lineno)
 
         return robj
 
@@ -178,6 +321,8 @@ class VariableGetter(object):
     any value from the stored variables dictionary.
     """
 
+    __slots__ = ('variables',)
+
     """
     Stored variables
     """
@@ -187,13 +332,9 @@ class VariableGetter(object):
         self.variables = variables
 
     def __getattr__(self, key):
-        return self.get(key)
+        return self.variables.get(key, '')
 
-    def __getitem__(self, key):
-        return self.get(key)
+    __getitem__ = __getattr__
 
     def get(self, key, default: str = ''):
-        if key in self.variables:
-            return self.variables[key]
-
-        return default
+        return self.variables.get(key, default)
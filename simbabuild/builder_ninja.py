@@ -3,10 +3,64 @@ from __future__ import annotations
 import textwrap
 import re
 import os
+import functools
+import collections
 
 from simbabuild.api import api
 from simbabuild.utility import as_list
 
+
+@functools.lru_cache(maxsize=None)
+def _relpath_cached(path: str) -> str:
+    """
+    Memoized rootdir_relpath: a dependency output is resolved once per
+    build instead of once per dependent edge.
+    """
+
+    return api.builder.rootdir_relpath(path)
+
+
+_isabs_cached = functools.lru_cache(maxsize=None)(os.path.isabs)
+
+"""
+Ninja $var placeholder, compiled once instead of per expand call
+"""
+_NINJA_VAR_RE = re.compile(r'\$(\$|\w*)')
+
+"""
+Characters escape_path rewrites, fused into a single scan instead of
+three chained str.replace passes
+"""
+_ESCAPE_PATH_RE = re.compile(r'\$ | |:')
+_ESCAPE_PATH_MAP = {'$ ': '$$$ ', ' ': '$ ', ':': '$:'}
+
+"""
+Ninja strings translated to str.format templates, keyed by the
+original string so each rule is translated once
+"""
+_translate_cache: dict[str, str] = dict()
+
+"""
+Fallback mapping so undefined variables expand to an empty string,
+matching ninja
+"""
+_EMPTY_DEFAULT: collections.defaultdict = collections.defaultdict(str)
+
+
+def _translate(string: str) -> str:
+    template = _translate_cache.get(string)
+    if template is None:
+        def repl(m):
+            var = m.group(1)
+            if var == '$':
+                return '$'
+            return '{%s}' % var if var else ''
+
+        template = _NINJA_VAR_RE.sub(
+            repl, string.replace('{', '{{').replace('}', '}}'))
+        _translate_cache[string] = template
+    return template
+
 class NinjaWriter(object):
     """
     Class for generating .ninja files.
@@ -99,62 +153,64 @@ class NinjaWriter(object):
 
         return outputs
 
-        def include(self, path):
-            self._line('include %s' % path)
-
-        def subninja(self, path):
-            self._line('subninja %s' % path)
-
-        def default(self, paths):
-            self._line('default %s' % ' '.join(as_list(paths)))
-
-        def _count_dollars_before_index(self, s, i):
-            """Returns the number of '$' characters right in front of s[i]."""
-            dollar_count = 0
-            dollar_index = i - 1
-            while dollar_index > 0 and s[dollar_index] == '$':
-                dollar_count += 1
-                dollar_index -= 1
-            return dollar_count
-
-        def _line(self, text, indent=0):
-            """Write 'text' word-wrapped at self.width characters."""
-            leading_space = '  ' * indent
-            while len(leading_space) + len(text) > self.width:
-                # The text is too wide; wrap if possible.
-
-                # Find the rightmost space that would obey our width constraint and
-                # that's not an escaped space.
-                available_space = self.width - len(leading_space) - len(' $')
-                space = available_space
-                while True:
-                    space = text.rfind(' ', 0, space)
-                    if (space < 0 or
-                        self._count_dollars_before_index(text, space) % 2 == 0):
-                        break
+    def include(self, path):
+        self._line('include %s' % path)
+
+    def subninja(self, path):
+        self._line('subninja %s' % path)
 
-                if space < 0:
-                    # No such space; just use the first unescaped space we can find.
-                    space = available_space - 1
-                    while True:
-                        space = text.find(' ', space + 1)
-                        if (space < 0 or
-                            self._count_dollars_before_index(text, space) % 2 == 0):
-                            break
-                if space < 0:
-                    # Give up on breaking.
+    def default(self, paths):
+        self._line('default %s' % ' '.join(as_list(paths)))
+
+    @staticmethod
+    def _count_dollars_before_index(s, i):
+        """Returns the number of '$' characters right in front of s[i]."""
+        dollar_index = i - 1
+        while dollar_index > 0 and s[dollar_index] == '$':
+            dollar_index -= 1
+        return i - 1 - dollar_index
+
+    def _line(self, text, indent=0):
+        """Write 'text' word-wrapped at self.width characters."""
+        width = self.width
+        write = self.output.write
+        count_dollars = self._count_dollars_before_index
+
+        leading_space = '  ' * indent
+        while len(leading_space) + len(text) > width:
+            # The text is too wide; wrap if possible.
+
+            # Find the rightmost space that would obey our width constraint
+            # and that's not an escaped space.
+            available_space = width - len(leading_space) - len(' $')
+            space = available_space
+            while True:
+                space = text.rfind(' ', 0, space)
+                if space < 0 or count_dollars(text, space) % 2 == 0:
                     break
 
-                self.output.write(leading_space + text[0:space] + ' $\n')
-                text = text[space+1:]
+            if space < 0:
+                # No such space; just use the first unescaped space we can
+                # find.
+                space = available_space - 1
+                while True:
+                    space = text.find(' ', space + 1)
+                    if space < 0 or count_dollars(text, space) % 2 == 0:
+                        break
+            if space < 0:
+                # Give up on breaking.
+                break
 
-                # Subsequent lines are continuations, so indent them.
-                leading_space = '  ' * (indent+2)
+            write(leading_space + text[0:space] + ' $\n')
+            text = text[space+1:]
 
-            self.output.write(leading_space + text + '\n')
+            # Subsequent lines are continuations, so indent them.
+            leading_space = '  ' * (indent+2)
 
-        def close(self):
-            self.output.close()
+        write(leading_space + text + '\n')
+
+    def close(self):
+        self.output.close()
 
     @staticmethod
     def escape(string: str) -> str:
@@ -171,87 +227,128 @@ class NinjaWriter(object):
         Note: doesn't handle the full Ninja variable syntax, but it's enough
         to make configure.py's use of it work.
         """
-        def exp(m):
-            var = m.group(1)
-            if var == '$':
-                return '$'
-            return local_vars.get(var, vars.get(var, ''))
-        return re.sub(r'\$(\$|\w*)', exp, string)
+        return _translate(string).format_map(
+            collections.ChainMap(local_vars, vars, _EMPTY_DEFAULT))
 
     @staticmethod
     def escape_path(word: str) -> str:
-        return word.replace('$ ', '$$ ').replace(' ', '$ ').replace(':', '$:')
+        return _ESCAPE_PATH_RE.sub(
+            lambda m: _ESCAPE_PATH_MAP[m.group(0)], word)
 
 
 ###############################################################################
 
 async def builder(self: api.builder, targets: set):
-    with open('build.ninja', 'w') as file:
-        file.write("ninja_required_version = 1.3\n\n")
-
-        file.write("builddir = .\n")
-
-        rel_rootdir = os.path.relpath(
-            api.simba.options.rootdir,
-            start=api.simba.options.builddir,
-        )
-        file.write("rootdir = %s\n" % rel_rootdir)
-        file.write("\n")
-
-        visited = set()
-
-        def visit(target):
+    _relpath_cached.cache_clear()
+    _isabs_cached.cache_clear()
+
+    # accumulate the whole file and flush it in one buffered write,
+    # instead of crossing the io layer once per emitted line
+    buf = []
+    append = buf.append
+
+    append("ninja_required_version = 1.3\n\n")
+
+    append("builddir = .\n")
+
+    rel_rootdir = os.path.relpath(
+        api.simba.options.rootdir,
+        start=api.simba.options.builddir,
+    )
+    append("rootdir = %s\n" % rel_rootdir)
+    append("\n")
+
+    visited = set()
+    # direct dependencies discovered per target, reused at emission
+    dep_lists = dict()
+
+    DISCOVER, EMIT = 0, 1
+
+    # the loop body below is pure interpreter dispatch; hoist every
+    # global and attribute it touches into locals so each iteration
+    # pays array loads instead of dict lookups
+    join = os.path.join
+    dependency_type = api.dependency
+    generator_type = api.generator
+    relpath = _relpath_cached
+    isabs = _isabs_cached
+
+    # iterative post-order traversal: no Python frame per edge, no
+    # recursion limit on deep graphs, and children always emit before
+    # the build statement that references them
+    stack = [(target, DISCOVER) for target in targets]
+    push = stack.append
+
+    while stack:
+        target, state = stack.pop()
+
+        if state == DISCOVER:
             if target in visited:
-                return
+                continue
 
             visited.add(target)
+            push((target, EMIT))
+
+            if isinstance(target, dependency_type):
+                deps = [dep async for dep in target.get_dependencies()]
+                dep_lists[target] = deps
+
+                for dep in reversed(deps):
+                    push((dep, DISCOVER))
+
+                # externals are dependencies without a generator field
+                generator = getattr(target, 'generator', None)
+                if generator:
+                    push((generator, DISCOVER))
+
+            continue
+
+        if isinstance(target, generator_type):
+            append("rule %s\n" % target.name)
+            append("  command = %s\n" % target.command)
+            append("\n")
+
+        if isinstance(target, dependency_type):
+            # list plus a seen set: dedup with one hash probe per input
+            # and a stable emission order
+            inputs = []
+            inputs_seen = set()
+
+            for dep in dep_lists[target]:
+                dout = await dep.get_output()
+                path = relpath(dout)
+                if dep.provider == 'internal':
+                    path = join('$builddir', path)
+                elif not isabs(path):
+                    path = join('$rootdir', path)
+
+                if path not in inputs_seen:
+                    inputs_seen.add(path)
+                    inputs.append(path)
+
+            if target.provider != 'internal':
+                continue
+
+            if len(inputs) == 0:
+                continue
+
+            out = await target.get_output()
+            path = relpath(out)
+            if not isabs(path):
+                path = join('$builddir', path)
+
+            # generate target aliases
+            for a in target.aliases:
+                append("build %s: phony %s\n" % (a, path))
+
+            # generate the rule of this dependency
+            append("build %s: %s %s\n" % (
+                path,
+                target.generator.name if target.generator else 'phony',
+                ' '.join(inputs),
+            ))
 
-            if isinstance(target, api.generator):
-                file.write("rule %s\n" % target.name)
-                file.write("  command = %s\n" % target.command)
-                file.write("\n")
-
-            if isinstance(target, api.dependency):
-                if target.generator:
-                    visit(target.generator)
-
-                inputs = set()
-
-                for dep in target.get_dependencies():
-                    visit(dep)
-
-                    dout = dep.get_output()
-                    path = api.builder.rootdir_relpath(dout)
-                    if dep.provider == 'internal':
-                        inputs.add(os.path.join('$builddir', path))
-                    elif os.path.isabs(path):
-                        inputs.add(path)
-                    else:
-                        inputs.add(os.path.join('$rootdir', path))
-
-                if target.provider != 'internal':
-                    return
-
-                if len(inputs) == 0:
-                    return
-
-                out = target.get_output()
-                path = api.builder.rootdir_relpath(out)
-                if not os.path.isabs(path):
-                    path = os.path.join('$builddir', path)
-
-                # generate target aliases
-                for a in target.aliases:
-                    file.write("build %s: phony %s\n" % (a, path))
-
-                # generate the rule of this dependency
-                file.write("build %s: %s %s\n" % (
-                    path,
-                    target.generator.name if target.generator else 'phony',
-                    ' '.join(inputs),
-                ))
-
-        for target in targets:
-            visit(target)
+    with open('build.ninja', 'w') as file:
+        file.write(''.join(buf))
 
     await self.executor.run('-C', api.simba.options.builddir)
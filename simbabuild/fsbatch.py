@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import os
+import asyncio
+
+
+"""
+Directories already requested, mapped to an event set once they exist.
+Duplicate requests wait on the same event instead of issuing their own
+syscalls.
+"""
+_ensured: dict[str, asyncio.Event] = dict()
+
+
+async def ensure_dir(path: str) -> None:
+    """
+    Ensure a directory exists without blocking the event loop.
+
+    The creation runs on a worker thread and is coalesced, so concurrent
+    requests for the same directory share a single makedirs call.
+    """
+
+    event = _ensured.get(path)
+    if event is not None:
+        if not event.is_set():
+            await event.wait()
+        return
+
+    event = _ensured[path] = asyncio.Event()
+
+    try:
+        await asyncio.to_thread(os.makedirs, path, exist_ok=True)
+    except OSError:
+        del _ensured[path]
+        raise
+    finally:
+        event.set()
+
+
+async def ensure_dirs(paths) -> None:
+    """
+    Ensure a batch of directories exists, submitting them concurrently.
+    """
+
+    await asyncio.gather(*(ensure_dir(p) for p in set(paths)))
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from simbabuild.api import api, _
+from simbabuild.apiutility import clear_glob_cache
 from simbabuild.context import gcontext
 
 import simbabuild.utility
@@ -12,8 +13,6 @@ import argparse
 import os
 import sys
 import asyncio
-import rich.live
-import rich.tree
 import rich.traceback
 
 
@@ -28,7 +27,7 @@ async def build() -> None:
     if _.context.simba.options.targets:
         tgts = {api.target(t) for t in _.context.simba.options.targets}
     else:
-        tgts = {v for k, v in dict(_.registry).items()}
+        tgts = set(_.registry.values())
 
     builder_name = api.simba.options.builder
     if builder_name == 'default':
@@ -42,6 +41,9 @@ async def build() -> None:
 
 
 async def tree() -> None:
+    # deferred: only the tree command pays the import
+    import rich.tree
+
     _.report_status('Resolving the tree...')
 
     nodes = dict()
@@ -71,18 +73,25 @@ async def tree() -> None:
             node.children[child] = cnode
             cnode.parent[obj] = node
 
+        # sibling edges are independent, so descend into them
+        # concurrently; the node entry is registered before any await,
+        # which keeps revisits cheap
         if isinstance(obj, api.environment):
-            await pvisit(obj.parent)
-            await cvisit(obj.archiver)
-            await cvisit(obj.linker)
+            await asyncio.gather(
+                pvisit(obj.parent),
+                cvisit(obj.archiver),
+                cvisit(obj.linker),
+            )
         elif isinstance(obj, api.external):
             pass
         elif isinstance(obj, api.dependency):
-            await cvisit(obj.generator)
+            children = [obj.generator]
             async for a in obj.get_aliases():
-                await cvisit(a)
+                children.append(a)
             async for dep in obj.get_dependencies():
-                await cvisit(dep)
+                children.append(dep)
+
+            await asyncio.gather(*map(cvisit, children))
         elif isinstance(obj, api.filetype):
             await cvisit(obj.generator)
         elif isinstance(obj, api.generator):
@@ -92,7 +101,8 @@ async def tree() -> None:
 
         return node
 
-    for k, v in dict(_.registry).items():
+    # expanding can register new targets, so snapshot the values first
+    for v in list(_.registry.values()):
         await visit(await v.expand())
 
     tree = rich.tree.Tree('')
@@ -120,7 +130,7 @@ async def tree() -> None:
 async def check() -> None:
     _.report_status('Checking...')
 
-    for k, v in dict(_.registry).items():
+    for v in list(_.registry.values()):
         await v.expand()
 
 
@@ -168,12 +178,6 @@ def run() -> None:
         show_locals=simbabuild.utility.debugging,
     )
 
-    live_context = rich.live.Live(
-        console=console,
-        transient=True,
-        refresh_per_second=4,
-    )
-
     try:
         console_status.start()
         status('Setup context...')
@@ -191,9 +195,11 @@ def run() -> None:
                 gcontext.simba.options.recipe_file,
             )
         )
+        gcontext._ctxfolder = os.path.dirname(gcontext.__file__)
 
         async def async_run():
             status('Load recipes...')
+            clear_glob_cache()
             await _().load()
             await gcontext.simba.options.command_function()
 
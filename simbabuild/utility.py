@@ -33,6 +33,13 @@ Output console
 console = rich.console.Console()
 console_status = error_console.status('Initializing...', spinner='line')
 
+"""
+Whether live status updates are worth producing.  Without a terminal the
+spinner is never rendered, so formatting status lines is pure overhead
+unless verbose logging wants them.
+"""
+show_status: bool = error_console.is_terminal
+
 def status(msg: str) -> None:
     """
     Update the status.
@@ -94,17 +101,20 @@ def fatal(reason: str, *, file=None, line=None) -> NoReturn:
 
 class bunch:
     def __init__(self, **kwargs) -> None:
-        for key, value in kwargs.items():
-            setattr(self, key, value)
+        # one C-level dict update instead of a setattr per keyword; no
+        # bunch subclass customizes __setattr__
+        self.__dict__.update(kwargs)
 
     def __setitem__(self, key: str, value: Any) -> bunch:
         setattr(self, key, value)
         return self
 
     def __iter__(self):
-        for k in vars(self):
-            if not k.startswith('_'):
-                yield k, getattr(self, k)
+        # iterate the instance dict directly: one pass, no per-key
+        # attribute lookup through the MRO
+        for k, v in self.__dict__.items():
+            if k[0] != '_':
+                yield k, v
 
     @reprlib.recursive_repr()
     def __repr__(self) -> str:
@@ -149,14 +159,27 @@ def as_list(input: Any) -> list:
         return input
     return [input]
 
+"""
+Gate bounding concurrent subprocess spawns to the CPU count, so wide
+build graphs don't oversubscribe the machine.  Created lazily inside
+the running event loop.
+"""
+_shell_semaphore: asyncio.Semaphore | None = None
+
+
 async def async_shell(cmd, *, report: bool = True, exit_on_error: bool = True):
-    proc = await asyncio.create_subprocess_shell(
-        cmd,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
+    global _shell_semaphore
+    if _shell_semaphore is None:
+        _shell_semaphore = asyncio.Semaphore(os.cpu_count() or 4)
+
+    async with _shell_semaphore:
+        proc = await asyncio.create_subprocess_shell(
+            cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
 
-    stdout, stderr = await proc.communicate()
+        stdout, stderr = await proc.communicate()
 
     if report:
         if stdout or stderr: